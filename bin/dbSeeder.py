@@ -8,10 +8,13 @@ def sync_entities(remote_orion, local_orion, remote_ql, local_ql, api_key, histo
     if api_key:
         headers['x-api-key'] = api_key
 
+    # reuse connections across the many requests issued below
+    session = requests.Session()
+
     print(f"checking local environment at {local_orion}...")
 
     try:
-        local_check = requests.get(f"{local_orion}/?limit=1", headers=headers, timeout=5)
+        local_check = session.get(f"{local_orion}/?limit=1", headers=headers, timeout=5)
         if local_check.status_code == 200 and len(local_check.json()) > 0:
             print("local environment is available, skipping sync")
             sys.exit(0)
@@ -25,7 +28,7 @@ def sync_entities(remote_orion, local_orion, remote_ql, local_ql, api_key, histo
     synced_entities =[]
 
     while True:
-        response = requests.get(f"{remote_orion}?limit={limit}&offset={offset}", headers=headers)
+        response = session.get(f"{remote_orion}?limit={limit}&offset={offset}", headers=headers)
         if response.status_code != 200:
             print(f"Error fetching entities from remote Orion: {response.status_code} - {response.text}")
             sys.exit(1)
@@ -39,7 +42,7 @@ def sync_entities(remote_orion, local_orion, remote_ql, local_ql, api_key, histo
 
             synced_entities.append((entity_id, entity_type))
 
-            post_response = requests.post(local_orion, json=entity, headers=headers)
+            post_response = session.post(local_orion, json=entity, headers=headers)
 
             if post_response.status_code in [201, 204]:
                 total_orion_synced += 1
@@ -66,7 +69,7 @@ def sync_entities(remote_orion, local_orion, remote_ql, local_ql, api_key, histo
         print(f'\rSyncing History: |{bar}| {index+1}/{total_entities} Entities', end='', flush=True)
         
         history_url = f"{remote_ql}/entities/{entity_id}?fromDate={start_date}"
-        response = requests.get(history_url)
+        response = session.get(history_url)
 
         if response.status_code != 200:
             continue
@@ -101,7 +104,7 @@ def sync_entities(remote_orion, local_orion, remote_ql, local_ql, api_key, histo
                 "data": chunk,
                 "subscriptionId": "historical-seed"
             }
-            q_response = requests.post(f"{local_ql}/notify", json=payload, headers=headers)
+            q_response = session.post(f"{local_ql}/notify", json=payload, headers=headers)
 
             if q_response.status_code in [200, 201, 204]:
                 total_historical_records += len(chunk)
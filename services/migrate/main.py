@@ -2,16 +2,25 @@ import requests
 import time
 
 orion_url = "http://orion:1026/v2/subscriptions"
+page_size = 1000  # maximum supported by Orion
+
+# Shared session so consecutive calls to Orion reuse keep-alive connections
+SESSION = requests.Session()
 
 
 def get_all_subscriptions():
-    response = requests.get(orion_url)
-    response.raise_for_status()
-    return response.json()
+    subscriptions = []
+    while True:
+        response = SESSION.get(orion_url, params={"limit": page_size, "offset": len(subscriptions)})
+        response.raise_for_status()
+        page = response.json()
+        subscriptions.extend(page)
+        if len(page) < page_size:
+            return subscriptions
 
 
 def delete_subscription(sub_id):
-    response = requests.delete(f"{orion_url}/{sub_id}")
+    response = SESSION.delete(f"{orion_url}/{sub_id}")
     response.raise_for_status()
 
 
@@ -24,7 +33,7 @@ def delete_all_subscriptions():
 
 def create_subscription(filter: dict, filter_description: str, attrs: list):
     print(f"New subscription: {filter_description}")
-    response = requests.post(
+    response = SESSION.post(
         orion_url,
         json={
             "description": f"Feed {filter_description} into quantum leap",
@@ -59,7 +68,7 @@ def wait_fiware_ready():
     print("Waiting for Fiware to be ready...")
     while True:
         try:
-            response = requests.get(orion_url)
+            response = SESSION.get(orion_url)
             if response.status_code == 200:
                 print("Fiware is ready.")
                 break
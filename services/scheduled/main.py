@@ -1,34 +1,54 @@
 #! /usr/bin/env python
 
 from typing import List, Tuple
-import json
+import bisect
+import ijson
+import logging
+import orjson
 import signal
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import time
 import datetime
+import numpy as np
 from dataclasses import dataclass
 
 SECS_PER_DAY = 24 * 60 * 60
 ORION_HOST = "http://orion:1026"
 TRACKS_FILE = "harbor.tracks"
-
-
-@dataclass
-class Position:
-    lat: float
-    lon: float
-
-    @classmethod
-    def from_dict(self, d):
-        return Position(d[0], d[1])
-
-
-@dataclass
+ORION_ENTITIES_URL = f"{ORION_HOST}/v2/entities"
+ORION_UPDATE_URL = f"{ORION_HOST}/v2/op/update"
+PAGE_SIZE = 1000  # maximum supported by Orion
+TIMEOUT = 2  # seconds, keeps a stuck request from stalling the tick loop
+
+log = logging.getLogger("scheduled")
+
+# Shared session so consecutive calls to Orion reuse keep-alive connections.
+# Requests are sent one at a time to a single host, so one pooled connection is
+# enough. Batch append/delete are idempotent, so POSTs may be retried as well.
+SESSION = requests.Session()
+SESSION.mount(
+    "http://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.1,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+        ),
+    ),
+)
+
+
+@dataclass(slots=True)
 class Track:
     id: int
     type: str
     start: int
-    positions: List[Position]
+    positions: np.ndarray  # shape (n, 2), columns lat, lon
 
     @classmethod
     def from_dict(self, d):
@@ -36,69 +56,101 @@ class Track:
             d["id"],
             d["type"],
             d["start"],
-            [Position.from_dict(i) for i in d["positions"]],
+            np.asarray(d["positions"], dtype=np.float64).reshape(-1, 2),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ActiveTrack:
     track: Track
     idx: int
+    entity: dict  # reused Orion payload, only the coordinates change per tick
+
+    def move_to(self, pos: np.ndarray):
+        self.entity["location"]["value"]["coordinates"] = pos.tolist()
 
 
 def load(path) -> Tuple[int, List[Track]]:
-    print(f"Reading {path}")
-    with open(path) as f:
-        data = json.load(f)
-    tracks = [Track.from_dict(i) for i in data["tracks"]]
-    period = int(data["period"])
-    print(f"Tracks: {len(tracks)}")
-    print(f"Period: {period}s")
+    log.info("Reading %s", path)
+    # Stream the file so only one track is materialized as Python objects at a time
+    with open(path, "rb") as f:
+        tracks = [Track.from_dict(i) for i in ijson.items(f, "tracks.item", use_float=True)]
+        f.seek(0)
+        period = int(next(ijson.items(f, "period")))
+    tracks.sort(key=lambda t: t.start)
+    log.info("Tracks: %d", len(tracks))
+    log.info("Period: %ds", period)
     return period, tracks
 
 
-def update_vehicle(id: int, pos: Position, category: str):
-    response = requests.put(
-        f"{ORION_HOST}/v2/entities/{id}/attrs/location/value",
-        json={"coordinates": [pos.lat, pos.lon]},
+def vehicle_entity(id: str, category: str) -> dict:
+    return {
+        "id": id,
+        "type": "Vehicle",
+        "category": {"type": "string", "value": category},
+        "source": {"type": "string", "value": "scheduled"},
+        "location": {
+            "type": "geo:json",
+            "value": {"type": "Point", "coordinates": []},
+        },
+    }
+
+
+def post_json(url: str, body) -> requests.Response:
+    # Serialize straight to bytes instead of going through requests' stdlib json
+    return SESSION.post(
+        url,
+        data=orjson.dumps(body),
+        headers={"Content-Type": "application/json"},
+        timeout=TIMEOUT,
     )
-    if response.status_code == 204:
+
+
+def update_vehicles(entities: List[dict]):
+    # "append" creates missing vehicles and updates existing ones in one request
+    if not entities:
         return
-    elif response.status_code == 404:
-        print(f"Creating {id}")
-        response = requests.post(
-            f"{ORION_HOST}/v2/entities",
-            json={
-                "id": id,
-                "type": "Vehicle",
-                "category": {"type": "string", "value": category},
-                "source": {"type": "string", "value": "scheduled"},
-                "location": {
-                    "type": "geo:json",
-                    "value": {"type": "Point", "coordinates": [pos.lat, pos.lon]},
-                },
-            },
-        )
-        if response.status_code != 201:
-            print(f"Failed to create: {response.status_code}, {response.content}")
-    else:
-        print(f"Got unexpected status {response.status_code}, {response.content}")
+    try:
+        response = post_json(ORION_UPDATE_URL, {"actionType": "append", "entities": entities})
+    except requests.RequestException as e:
+        log.warning("Failed to update vehicles: %s", e)
+        return
+    if response.status_code != 204:
+        log.warning("Failed to update vehicles: %s, %s", response.status_code, response.content)
 
 
-def delete_vehicle(id: int):
-    response = requests.delete(f"{ORION_HOST}/v2/entities/{id}")
+def delete_vehicles(ids: List[str]) -> bool:
+    if not ids:
+        return True
+    try:
+        response = post_json(
+            ORION_UPDATE_URL,
+            {"actionType": "delete", "entities": [{"id": id, "type": "Vehicle"} for id in ids]},
+        )
+    except requests.RequestException as e:
+        log.warning("Failed to delete %s, %s", ids, e)
+        return False
     if response.status_code != 204:
-        print(f"Failed to delete {id}, {response.status_code}, {response.content}")
+        log.warning("Failed to delete %s, %s, %s", ids, response.status_code, response.content)
+        return False
+    return True
 
 
 def delete_all_vehicles():
-    response = requests.get(
-        f"{ORION_HOST}/v2/entities", params={"type": "Vehicle", "limit": 1000, "q": "source==scheduled"}
-    )
-    # TODO: pagination
-    for vehicle in response.json():
-        print(f"Deleting {vehicle['id']}")
-        delete_vehicle(vehicle["id"])
+    # Deleted vehicles drop out of the result set, so always fetch the first page
+    while True:
+        response = SESSION.get(
+            ORION_ENTITIES_URL,
+            params={"type": "Vehicle", "limit": PAGE_SIZE, "q": "source==scheduled"},
+            timeout=TIMEOUT,
+        )
+        response.raise_for_status()
+        ids = [vehicle["id"] for vehicle in orjson.loads(response.content)]
+        if not ids:
+            break
+        log.info("Deleting %d vehicles", len(ids))
+        if not delete_vehicles(ids):
+            break
 
 
 def main():
@@ -108,7 +160,7 @@ def main():
     def sigint_handler(signum, frame):
         nonlocal running
         running = False
-        print("Received SIGINT, stopping...")
+        log.info("Received SIGINT, stopping...")
 
     signal.signal(signal.SIGINT, sigint_handler)
 
@@ -120,41 +172,59 @@ def main():
     now = datetime.datetime.now()
     step = int((now.hour * 3600 + now.minute * 60 + now.second) / period)
 
-    # Find active tracks for current time
-    track_idx = 0
+    # Skip tracks that have already started before now
+    track_idx = bisect.bisect_left(tracks, step, key=lambda t: t.start)
     active_tracks: List[ActiveTrack] = []
-    while tracks[track_idx].start < step:
-        track_idx += 1
 
+    deadline = time.monotonic()
     while running:
 
         # Start tracks
-        while tracks[track_idx].start < step:
+        while track_idx < len(tracks) and tracks[track_idx].start < step:
             track = tracks[track_idx]
-            print(f"{step} Starting track {track.id}")
-            active_tracks.append(ActiveTrack(track, 0))
+            log.info("%d Starting track %d", step, track.id)
+            entity = vehicle_entity(f"Vehicles:{track.id}", track.type)
+            active_tracks.append(ActiveTrack(track, 0, entity))
             track_idx += 1
 
         # Advance active tracks
-        new_active_tracks = []
+        updates = []
+        stopped = []
         for active_track in active_tracks:
-            pos = active_track.track.positions[active_track.idx]
-            full_id = f"Vehicles:{active_track.track.id}"
-            update_vehicle(full_id, pos, track.type)
+            track = active_track.track
+            active_track.move_to(track.positions[active_track.idx])
+            updates.append(active_track.entity)
             active_track.idx += 1
-            if active_track.idx >= len(active_track.track.positions):
-                print(f"{step} Stopping track {active_track.track.id}")
-                delete_vehicle(full_id)
-            else:
-                new_active_tracks.append(active_track)
-        active_tracks = new_active_tracks
-
-        # Next sec
-        time.sleep(period)  # TODO: accurate timing
-        step = (step + 1) % SECS_PER_DAY
-
-    print("Goodbye :)")
+            if active_track.idx >= len(track.positions):
+                log.info("%d Stopping track %d", step, track.id)
+                stopped.append(active_track.entity["id"])
+        if stopped:
+            # Only compact the list on ticks where a track actually finished
+            active_tracks[:] = [at for at in active_tracks if at.idx < len(at.track.positions)]
+        update_vehicles(updates)
+        delete_vehicles(stopped)
+
+        # Sleep until the next tick, ignoring the time spent on this one. If we
+        # fell behind by whole periods, skip those ticks to stay on wall time.
+        deadline += period
+        delay = deadline - time.monotonic()
+        skipped = 0
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            skipped = int(-delay // period)
+            deadline += skipped * period
+            for active_track in active_tracks:
+                last_idx = len(active_track.track.positions) - 1
+                active_track.idx = min(active_track.idx + skipped, last_idx)
+        next_step = (step + 1 + skipped) % SECS_PER_DAY
+        if next_step < step:
+            track_idx = 0
+        step = next_step
+
+    log.info("Goodbye :)")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     main()